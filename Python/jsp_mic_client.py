@@ -5,6 +5,7 @@
 Requirements (recommended):
   - python3 -m pip install -r JSpeak/Python/requirements.txt
   - python3 -m pip install sounddevice
+  - Optional: python3 -m pip install numba (JIT-compiled resampler; falls back to NumPy)
   - If sounddevice fails to install/run, you may need: brew install portaudio
 
 Examples:
@@ -15,16 +16,28 @@ Controls:
   - Ctrl-C to stop and finalize
 """
 
-import base64
+import io
 import json
+import math
 import os
 import queue
+import secrets
+import struct
 import subprocess
 import sys
 import threading
 import time
 import uuid
 
+try:
+    import numpy as np
+    from numba import njit
+
+    _NUMBA_AVAILABLE = True
+except ImportError:
+    njit = None
+    _NUMBA_AVAILABLE = False
+
 
 def _service_path() -> str:
     here = os.path.dirname(os.path.abspath(__file__))
@@ -32,16 +45,313 @@ def _service_path() -> str:
 
 
 def _req(method: str, params: dict | None = None) -> dict:
-    return {"id": str(uuid.uuid4()), "method": method, "params": params or {}}
+    # Request ids only need to be unique within this pipe.
+    return {"id": secrets.token_hex(8), "method": method, "params": params or {}}
+
+
+# Binary stream_push frame; must match jsp_speech_service._PUSH_HEADER.
+_OP_PUSH = 0x01
+_PUSH_HEADER = struct.Struct("<BHI")
+
+
+def _push_frame(sid: bytes, pcm16: bytes) -> list:
+    # `sid` is the UTF-8 session id, encoded once per session by the caller.
+    # Returned as separate buffers for _writev_all; nothing is concatenated.
+    return [_PUSH_HEADER.pack(_OP_PUSH, len(sid), len(pcm16)), sid, pcm16]
+
+
+def _writev_all(fd: int, bufs: list):
+    # One scatter-gather syscall per frame; the pipe is unbuffered, so this
+    # is also the only copy. Falls back to plain writes if only part fits.
+    total = sum(len(b) for b in bufs)
+    written = os.writev(fd, bufs)
+    if written < total:
+        rest = memoryview(b"".join(bufs))[written:]
+        while rest:
+            rest = rest[os.write(fd, rest) :]
+
+
+def _send_json(stdin, obj: dict):
+    stdin.write(json.dumps(obj).encode("utf-8") + b"\n")
+
+
+# Pushes the service may be working on before the sender waits.
+_MAX_INFLIGHT_PUSHES = 8
+
+
+def _print_push_result(resp: dict):
+    result = resp.get("result") or {}
+    kind = result.get("kind")
+    text = result.get("text")
+    actions = result.get("actions")
+    if kind in ("partial", "final") and text:
+        sys.stderr.write(f"[{kind}] {text}\n")
+    if actions:
+        sys.stderr.write(f"[{kind}:actions] {actions}\n")
+
+
+def _sender_loop(
+    service,
+    session_id: str,
+    chunks: "queue.SimpleQueue",
+    inflight: threading.Semaphore,
+    dead: threading.Event,
+):
+    # Writes push frames without waiting for replies, so the consumer thread
+    # only does audio work. A None item ends the loop, and so does the service
+    # exiting (`dead`, set by the reader), which drops any remaining chunks.
+    sid = session_id.encode("utf-8")
+    fd = service.stdin.fileno()
+    for chunk in iter(chunks.get, None):
+        inflight.acquire()
+        if dead.is_set():
+            return
+        try:
+            _writev_all(fd, _push_frame(sid, chunk))
+        except BrokenPipeError:
+            return
+
+
+def _reader_loop(
+    stdout,
+    inflight: threading.Semaphore,
+    replies: "queue.SimpleQueue",
+    dead: threading.Event,
+):
+    # Push frames are answered with an empty id: print those as they arrive.
+    # Replies to JSON requests go to `replies`; None marks end of output.
+    try:
+        for line in iter(stdout.readline, b""):
+            line = line.strip()
+            if not line:
+                continue
+            resp = json.loads(line)
+            if resp.get("id"):
+                replies.put(resp)
+                continue
+            inflight.release()
+            _print_push_result(resp)
+    finally:
+        # On EOF the pushes still in flight will never be answered: flag the
+        # service as gone and wake a sender blocked on a full window.
+        dead.set()
+        replies.put(None)
+        try:
+            inflight.release()
+        except ValueError:
+            pass
+
+
+if _NUMBA_AVAILABLE:
+
+    @njit(cache=True, fastmath=True)
+    def _resample_linear(
+        x, prev, base, phase, step_int, step_frac, period, frac_lut, out
+    ):
+        # One fused pass: interpolate straight into `out`, no temporaries.
+        # Position j is base + phase / period input samples into x; base may
+        # be -1, meaning "between the previous chunk's last sample and x[0]".
+        # All arithmetic stays float32 (prev included) so nothing widens to
+        # float64 and LLVM can use full-width float32 vectors.
+        one = np.float32(1.0)
+        for j in range(out.size):
+            a = prev if base < 0 else x[base]
+            f = frac_lut[phase]
+            out[j] = a * (one - f) + x[base + 1] * f
+            base += step_int
+            phase += step_frac
+            if phase >= period:
+                phase -= period
+                base += 1
+
+    @njit(cache=True, fastmath=True, inline="always")
+    def _sat_s16(v):
+        # [-1, 1) float -> saturated int16. Written as min/max rather than
+        # branches so LLVM lowers it to straight-line vector min/max + cvt.
+        v = v * np.float32(32768.0)
+        return np.int16(min(np.float32(32767.0), max(np.float32(-32768.0), v)))
+
+    @njit(cache=True, fastmath=True)
+    def _f32_to_s16le(y, out_i16):
+        # Scale, saturate and cast in a single pass over y.
+        for k in range(y.size):
+            out_i16[k] = _sat_s16(y[k])
+
+    @njit(cache=True, fastmath=True)
+    def _resample_linear_s16(
+        x, prev, base, phase, step_int, step_frac, period, frac_lut, out_i16
+    ):
+        # _resample_linear fused with _f32_to_s16le: interpolate, scale,
+        # saturate and pack without an intermediate float32 buffer.
+        one = np.float32(1.0)
+        for j in range(out_i16.size):
+            a = prev if base < 0 else x[base]
+            f = frac_lut[phase]
+            out_i16[j] = _sat_s16(a * (one - f) + x[base + 1] * f)
+            base += step_int
+            phase += step_frac
+            if phase >= period:
+                phase -= period
+                base += 1
+
+    @njit(cache=True, fastmath=True)
+    def _polyphase(xe, base, phase, step_int, step_frac, taps, out):
+        # out[j] = dot(taps[phase], xe[base], xe[base - 1], ...); `base` is
+        # an index into xe, which starts with the filter history.
+        period, ntap = taps.shape
+        for j in range(out.size):
+            acc = np.float32(0.0)
+            for k in range(ntap):
+                acc += taps[phase, k] * xe[base - k]
+            out[j] = acc
+            base += step_int
+            phase += step_frac
+            if phase >= period:
+                phase -= period
+                base += 1
+
+    @njit(cache=True, fastmath=True)
+    def _polyphase_s16(xe, base, phase, step_int, step_frac, taps, out_i16):
+        # _polyphase fused with _f32_to_s16le.
+        period, ntap = taps.shape
+        for j in range(out_i16.size):
+            acc = np.float32(0.0)
+            for k in range(ntap):
+                acc += taps[phase, k] * xe[base - k]
+            out_i16[j] = _sat_s16(acc)
+            base += step_int
+            phase += step_frac
+            if phase >= period:
+                phase -= period
+                base += 1
+
+
+def _float32_to_s16(y, out_i16):
+    # `out_i16` is a reusable scratch buffer with at least y.size slots;
+    # returns the filled view of it.
+    n = int(y.size)
+    if _NUMBA_AVAILABLE:
+        _f32_to_s16le(y, out_i16)
+    else:
+        import numpy as np
+
+        np.clip(y * 32768.0, -32768, 32767, out=out_i16[:n], casting="unsafe")
+    return out_i16[:n]
+
+
+def _warm_up_kernels():
+    # Compile (or load from cache) before the first audio callback arrives.
+    if not _NUMBA_AVAILABLE:
+        return
+    import numpy as np
+
+    x = np.zeros((64,), dtype=np.float32)
+    # 3:2 exercises the interpolating kernels, 3:1 the strided decimation.
+    for in_sr, out_sr in ((3, 2), (3, 1)):
+        LinearResampler(in_sr, out_sr).process(x)
+        LinearResampler(in_sr, out_sr).process_pcm16(x)
+    PolyphaseResampler(3, 2).process(x)
+    PolyphaseResampler(3, 2).process_pcm16(x)
+    # Contiguous input, for 16k capture that skips resampling.
+    _f32_to_s16le(x, np.empty(x.shape, dtype=np.int16))
 
 
 class LinearResampler:
     def __init__(self, in_sr: int, out_sr: int):
+        import numpy as np
+
         self.in_sr = int(in_sr)
         self.out_sr = int(out_sr)
         self.step = float(self.in_sr) / float(self.out_sr)
-        self.in_index = 0
-        self.next_pos = 0.0
+        # in_sr/out_sr never change, so keep positions exact as
+        # base + phase / period (base counted from the start of the next
+        # chunk) and precompute everything that depends only on the ratio.
+        g = math.gcd(self.in_sr, self.out_sr)
+        self.period = self.out_sr // g
+        self.step_num = self.in_sr // g
+        self.step_int, self.step_frac = divmod(self.step_num, self.period)
+        # Integer ratio (48k/32k/16k -> 16k): every position is a whole
+        # sample, so resampling is plain decimation.
+        self.decimate = self.period == 1
+        self.frac_lut = (np.arange(self.period, dtype=np.float64) / self.period).astype(
+            np.float32
+        )
+        self.base = 0
+        self.phase = 0
+        self.prev = np.float32(0.0)
+        self._i16_buf = None
+
+    def _scratch_i16(self, size: int):
+        import numpy as np
+
+        if self._i16_buf is None or self._i16_buf.size < size:
+            self._i16_buf = np.empty((max(size, 4096),), dtype=np.int16)
+        return self._i16_buf
+
+    def _output_count(self, n: int) -> int:
+        # Output samples whose position can be resolved within this chunk.
+        if self.decimate:
+            return max(0, -(-(n - self.base) // self.step_num))
+        start = self.base * self.period + self.phase
+        limit = (n - 1) * self.period
+        return max(0, -(-(limit - start) // self.step_num))
+
+    def _advance(self, x, n: int, count: int):
+        end = self.base * self.period + self.phase + count * self.step_num
+        self.base, self.phase = divmod(end, self.period)
+        self.base -= n
+        if n > 0:
+            self.prev = x[n - 1]
+
+    def _interpolate(self, x, count: int):
+        # NumPy fallback for the interpolating kernels.
+        import numpy as np
+
+        # Positions are exact integers well inside int32 for any chunk size we
+        # see, so int32/float32 arrays halve the bandwidth of this path.
+        pos = np.int32(self.base * self.period + self.phase)
+        pos = pos + np.arange(count, dtype=np.int32) * np.int32(self.step_num)
+        i0, phase = np.divmod(pos, np.int32(self.period))
+        # xp[i + 1] == x[i], and xp[0] is the previous chunk's last sample.
+        xp = np.concatenate((np.array([self.prev], dtype=np.float32), x))
+        frac = self.frac_lut[phase]
+        return (xp[i0 + 1] * (np.float32(1.0) - frac)) + (xp[i0 + 2] * frac)
+
+    def process_pcm16(self, x_f32) -> bytes:
+        """Resample and pack to little-endian int16 PCM bytes."""
+        return self.process_s16(x_f32).tobytes()
+
+    def process_s16(self, x_f32):
+        """Resample and pack to int16 in one pass.
+
+        Returns a view of an internal buffer, valid until the next call.
+        """
+        if not _NUMBA_AVAILABLE:
+            y = self.process(x_f32)
+            return _float32_to_s16(y, self._scratch_i16(int(y.size)))
+
+        x = x_f32
+        if x.ndim != 1:
+            x = x.reshape((-1,))
+        n = int(x.size)
+        count = self._output_count(n)
+        out = self._scratch_i16(count)[:count]
+        if count > 0 and self.decimate:
+            _f32_to_s16le(x[self.base :: self.step_num], out)
+        elif count > 0:
+            _resample_linear_s16(
+                x,
+                self.prev,
+                self.base,
+                self.phase,
+                self.step_int,
+                self.step_frac,
+                self.period,
+                self.frac_lut,
+                out,
+            )
+        self._advance(x, n, count)
+        return out
 
     def process(self, x_f32):
         import numpy as np
@@ -50,34 +360,234 @@ class LinearResampler:
         if x.ndim != 1:
             x = x.reshape((-1,))
         n = int(x.size)
-        if n < 2:
-            self.in_index += n
-            return np.zeros((0,), dtype=np.float32)
+        count = self._output_count(n)
+        if count <= 0:
+            y = np.zeros((0,), dtype=np.float32)
+        elif self.decimate:
+            y = x[self.base :: self.step_num].astype(np.float32)
+        elif _NUMBA_AVAILABLE:
+            y = np.empty((count,), dtype=np.float32)
+            _resample_linear(
+                x,
+                self.prev,
+                self.base,
+                self.phase,
+                self.step_int,
+                self.step_frac,
+                self.period,
+                self.frac_lut,
+                y,
+            )
+        else:
+            y = self._interpolate(x, count).astype(np.float32, copy=False)
+        self._advance(x, n, count)
+        return y
 
-        chunk_start = self.in_index
-        chunk_end = self.in_index + n
 
-        # Generate positions that can be interpolated within this chunk.
-        last_pos = chunk_end - 1
-        if self.next_pos > last_pos:
-            self.in_index += n
-            return np.zeros((0,), dtype=np.float32)
+class PolyphaseResampler(LinearResampler):
+    """Windowed-sinc polyphase FIR resampler.
 
-        positions = np.arange(self.next_pos, last_pos, self.step, dtype=np.float64)
-        if positions.size == 0:
-            self.in_index += n
-            return np.zeros((0,), dtype=np.float32)
+    Linear interpolation aliases high frequencies into the speech band, which
+    hurts ASR. This runs a Kaiser-windowed lowpass at the rational ratio
+    out_sr/in_sr, split into one short filter per phase so each output
+    sample is a single dot product over the newest input samples.
+    """
 
-        rel = positions - float(chunk_start)
-        i0 = np.floor(rel).astype(np.int64)
-        frac = (rel - i0).astype(np.float32)
-        # Safety: ensure i0+1 in range
-        i0 = np.clip(i0, 0, n - 2)
-        y = (x[i0] * (1.0 - frac)) + (x[i0 + 1] * frac)
+    def __init__(
+        self, in_sr: int, out_sr: int, taps_per_phase: int = 24, beta: float = 8.0
+    ):
+        import numpy as np
 
-        self.next_pos = float(positions[-1] + self.step)
-        self.in_index += n
-        return y.astype(np.float32, copy=False)
+        super().__init__(in_sr, out_sr)
+        ntap = int(taps_per_phase)
+        up = self.period
+        # Prototype lowpass at the upsampled rate in_sr * up, cut off a bit
+        # below the lower of the two Nyquist frequencies.
+        fc = 0.45 / max(up, self.step_num)
+        n = np.arange(ntap * up, dtype=np.float64) - (ntap * up - 1) / 2.0
+        h = 2.0 * fc * np.sinc(2.0 * fc * n) * np.kaiser(ntap * up, beta)
+        # taps[phase, k] weights the input sample k steps back; normalize each
+        # phase to unit DC gain.
+        taps = h.reshape((ntap, up)).T
+        taps = taps / taps.sum(axis=1, keepdims=True)
+        self.taps = np.ascontiguousarray(taps, dtype=np.float32)
+        self.history = np.zeros((ntap - 1,), dtype=np.float32)
+        self._work = None
+
+    def _output_count(self, n: int) -> int:
+        # Every output whose newest contributing input sample is in x.
+        start = self.base * self.period + self.phase
+        return max(0, -(-(n * self.period - start) // self.step_num))
+
+    def _extend(self, x):
+        # history + x in one reusable buffer.
+        import numpy as np
+
+        h = self.history.size
+        size = h + int(x.size)
+        if self._work is None or self._work.size < size:
+            self._work = np.empty((max(size, 8192),), dtype=np.float32)
+        xe = self._work[:size]
+        xe[:h] = self.history
+        xe[h:] = x
+        return xe
+
+    def _advance(self, xe, n: int, count: int):
+        end = self.base * self.period + self.phase + count * self.step_num
+        self.base, self.phase = divmod(end, self.period)
+        self.base -= n
+        self.history[:] = xe[xe.size - self.history.size :]
+
+    def _filter_np(self, xe, count: int):
+        # NumPy fallback for the polyphase kernels.
+        import numpy as np
+
+        pos = np.int32(self.base * self.period + self.phase)
+        pos = pos + np.arange(count, dtype=np.int32) * np.int32(self.step_num)
+        base, phase = np.divmod(pos, np.int32(self.period))
+        idx = (base + self.history.size)[:, None] - np.arange(self.taps.shape[1])
+        return np.einsum("jk,jk->j", self.taps[phase], xe[idx])
+
+    def process_s16(self, x_f32):
+        """Resample and pack to int16 in one pass (see LinearResampler)."""
+        if not _NUMBA_AVAILABLE:
+            y = self.process(x_f32)
+            return _float32_to_s16(y, self._scratch_i16(int(y.size)))
+
+        x = x_f32.reshape((-1,))
+        n = int(x.size)
+        count = self._output_count(n)
+        xe = self._extend(x)
+        out = self._scratch_i16(count)[:count]
+        if count > 0:
+            _polyphase_s16(
+                xe,
+                self.base + self.history.size,
+                self.phase,
+                self.step_int,
+                self.step_frac,
+                self.taps,
+                out,
+            )
+        self._advance(xe, n, count)
+        return out
+
+    def process(self, x_f32):
+        import numpy as np
+
+        x = x_f32.reshape((-1,))
+        n = int(x.size)
+        count = self._output_count(n)
+        xe = self._extend(x)
+        y = np.empty((max(count, 0),), dtype=np.float32)
+        if count > 0 and _NUMBA_AVAILABLE:
+            _polyphase(
+                xe,
+                self.base + self.history.size,
+                self.phase,
+                self.step_int,
+                self.step_frac,
+                self.taps,
+                y,
+            )
+        elif count > 0:
+            y[:] = self._filter_np(xe, count)
+        self._advance(xe, n, count)
+        return y
+
+
+class FrameRing:
+    """Single-producer/single-consumer ring of preallocated float32 blocks.
+
+    The audio callback pushes and the consumer thread reads; neither side
+    allocates or takes a lock. Each index is stored by only one side, and a
+    plain attribute store is atomic under the GIL.
+    """
+
+    def __init__(self, slots: int = 64, max_block: int = 4096):
+        import numpy as np
+
+        self.slots = int(slots)
+        self.max_block = int(max_block)
+        self.buf = np.zeros((self.slots, self.max_block), dtype=np.float32)
+        self.sizes = np.zeros((self.slots,), dtype=np.int64)
+        # Bound here so the audio callback never runs an import statement.
+        self._copyto = np.copyto
+        self.write_idx = 0
+        self.read_idx = 0
+
+    def push(self, x) -> bool:
+        # Producer side. Returns False (dropping the rest) when full.
+        n = int(x.shape[0])
+        off = 0
+        while off < n:
+            w = self.write_idx
+            if w - self.read_idx >= self.slots:
+                return False
+            slot = w % self.slots
+            k = min(n - off, self.max_block)
+            # The stream is opened as float32, so this is a plain memcpy
+            # (strided only for multi-channel input); no dtype conversion.
+            self._copyto(self.buf[slot, :k], x[off : off + k], casting="no")
+            self.sizes[slot] = k
+            self.write_idx = w + 1
+            off += k
+        return True
+
+    def drain_into(self, out, min_samples: int) -> int:
+        # Consumer side: once at least min_samples are queued, copy whole
+        # blocks into `out` (up to its size) and release them. Returns the
+        # number of samples copied, or 0 if not enough audio is queued yet.
+        r = self.read_idx
+        w = self.write_idx
+        end = r
+        total = 0
+        while end < w and total < min_samples:
+            k = int(self.sizes[end % self.slots])
+            if total + k > out.shape[0]:
+                break
+            total += k
+            end += 1
+        if total < min_samples and end == w:
+            return 0
+
+        off = 0
+        for i in range(r, end):
+            slot = i % self.slots
+            k = int(self.sizes[slot])
+            out[off : off + k] = self.buf[slot, :k]
+            off += k
+        self.read_idx = end
+        return total
+
+
+# macOS QoS class for latency-critical, user-facing work (<sys/qos.h>).
+_QOS_CLASS_USER_INTERACTIVE = 0x21
+
+
+def _raise_consumer_priority() -> None:
+    # Best effort: ask the OS to run the calling (consumer) thread promptly so
+    # scheduler jitter doesn't back the ring up into dropped blocks. Every
+    # step is optional and silently skipped without the needed privileges.
+    if sys.platform.startswith("linux"):
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(50))
+        except (AttributeError, OSError):
+            pass
+        try:
+            cpus = sorted(os.sched_getaffinity(0))
+            if len(cpus) > 1:
+                os.sched_setaffinity(0, {cpus[-1]})
+        except (AttributeError, OSError):
+            pass
+    elif sys.platform == "darwin":
+        try:
+            import ctypes
+
+            libc = ctypes.CDLL("/usr/lib/libSystem.dylib")
+            libc.pthread_set_qos_class_self_np(_QOS_CLASS_USER_INTERACTIVE, 0)
+        except (AttributeError, OSError):
+            pass
 
 
 def _parse_args(argv):
@@ -86,6 +596,7 @@ def _parse_args(argv):
     partial_interval_ms = 500
     model = None
     device = None
+    resampler = "polyphase"
     i = 1
     while i < len(argv):
         a = argv[i]
@@ -109,6 +620,12 @@ def _parse_args(argv):
             device = argv[i + 1]
             i += 2
             continue
+        if a == "--resampler" and i + 1 < len(argv):
+            resampler = argv[i + 1]
+            if resampler not in ("polyphase", "linear"):
+                raise SystemExit(f"Unknown resampler: {resampler}")
+            i += 2
+            continue
         if a in ("-h", "--help"):
             return None
         raise SystemExit(f"Unknown arg: {a}")
@@ -119,6 +636,7 @@ def _parse_args(argv):
         "partial_interval_ms": partial_interval_ms,
         "model": model,
         "device": device,
+        "resampler": resampler,
     }
 
 
@@ -126,7 +644,7 @@ def main() -> int:
     args = _parse_args(sys.argv)
     if args is None:
         print(
-            "Usage: jsp_mic_client.py [--mixed] [--language zh|auto|en] [--partial-interval-ms 500] [--model <hf_repo>] [--device <name_or_index>]",
+            "Usage: jsp_mic_client.py [--mixed] [--language zh|auto|en] [--partial-interval-ms 500] [--model <hf_repo>] [--device <name_or_index>] [--resampler polyphase|linear]",
             file=sys.stderr,
         )
         return 2
@@ -136,6 +654,8 @@ def main() -> int:
     except Exception as e:
         raise SystemExit(f"numpy not available: {e}")
 
+    _warm_up_kernels()
+
     try:
         import sounddevice as sd
     except Exception as e:
@@ -149,36 +669,51 @@ def main() -> int:
         [sys.executable, _service_path()],
         stdin=subprocess.PIPE,
         stdout=subprocess.PIPE,
-        text=True,
-        bufsize=1,
+        text=False,
+        bufsize=0,
     )
     if service.stdin is None or service.stdout is None:
         raise RuntimeError("Failed to open service pipes")
+    # bufsize=0 is for stdin, which push frames bypass via writev on its fd.
+    # Replies are read a line at a time, so stdout gets its own buffer;
+    # readline on the raw pipe would issue one read() per byte.
+    service_out = io.BufferedReader(service.stdout)
 
     session_id = str(uuid.uuid4())
     out_sr = 16000
 
-    q: "queue.Queue[np.ndarray]" = queue.Queue(maxsize=50)
+    ring = FrameRing()
     stop = threading.Event()
 
     def audio_cb(indata, frames, time_info, status):
         if stop.is_set():
             return
-        x = indata[:, 0].astype(np.float32, copy=True)
-        try:
-            q.put_nowait(x)
-        except queue.Full:
-            # Drop if we can't keep up.
-            pass
+        # PortAudio reuses `indata` after we return, so copy it once, into
+        # preallocated memory; drops if we can't keep up.
+        ring.push(indata[:, 0])
 
-    # Choose input sample rate: try device default; resample to 16k.
+    # Choose input sample rate: prefer capturing at 16k directly (PortAudio /
+    # the driver then resamples, usually better than we can), otherwise use
+    # the device default and resample to 16k ourselves.
     dev_info = None
     try:
         dev_info = sd.query_devices(args["device"], "input")
     except Exception:
         dev_info = sd.query_devices(None, "input")
     in_sr = int(dev_info.get("default_samplerate") or 48000)
-    resampler = LinearResampler(in_sr=in_sr, out_sr=out_sr)
+    try:
+        sd.check_input_settings(
+            device=args["device"], channels=1, dtype="float32", samplerate=out_sr
+        )
+        in_sr = out_sr
+    except Exception:
+        pass
+    if in_sr == out_sr:
+        resampler = None
+    elif args["resampler"] == "linear":
+        resampler = LinearResampler(in_sr=in_sr, out_sr=out_sr)
+    else:
+        resampler = PolyphaseResampler(in_sr=in_sr, out_sr=out_sr)
 
     start_params = {
         "session_id": session_id,
@@ -192,17 +727,36 @@ def main() -> int:
     if args["model"] is not None:
         start_params["model"] = str(args["model"])
 
-    service.stdin.write(json.dumps(_req("stream_start", start_params)) + "\n")
-    service.stdin.flush()
-    _ = service.stdout.readline()
+    _send_json(service.stdin, _req("stream_start", start_params))
+    _ = service_out.readline()
 
     print(
         f"JSpeak mic streaming started (device_sr={in_sr} -> 16000). Ctrl-C to stop.",
         file=sys.stderr,
     )
 
-    chunk_bytes_target = int(0.30 * out_sr) * 2
-    out_pcm_buf = bytearray()
+    # Resampled audio is packed straight into one preallocated 300 ms chunk.
+    chunk_samples = int(0.30 * out_sr)
+    pending = np.empty((chunk_samples,), dtype=np.int16)
+    filled = 0
+    # Resample ~20 ms of device audio per call rather than every callback.
+    batch_samples = max(1, in_sr // 50)
+    batch = np.empty((batch_samples + ring.max_block,), dtype=np.float32)
+    batch_i16 = np.empty(batch.shape, dtype=np.int16)
+    chunks: "queue.SimpleQueue[bytes | None]" = queue.SimpleQueue()
+    replies: "queue.SimpleQueue[dict | None]" = queue.SimpleQueue()
+    inflight = threading.BoundedSemaphore(_MAX_INFLIGHT_PUSHES)
+    dead = threading.Event()
+    sender = threading.Thread(
+        target=_sender_loop,
+        args=(service, session_id, chunks, inflight, dead),
+        daemon=True,
+    )
+    reader = threading.Thread(
+        target=_reader_loop, args=(service_out, inflight, replies, dead), daemon=True
+    )
+    sender.start()
+    reader.start()
 
     try:
         with sd.InputStream(
@@ -213,49 +767,26 @@ def main() -> int:
             callback=audio_cb,
             blocksize=0,
         ):
+            _raise_consumer_priority()
             while True:
-                try:
-                    x = q.get(timeout=0.25)
-                except queue.Empty:
+                n = ring.drain_into(batch, batch_samples)
+                if n == 0:
+                    time.sleep(0.005)
                     continue
 
-                y = resampler.process(x)
-                if y.size == 0:
-                    continue
-                pcm16 = np.clip(y * 32768.0, -32768, 32767).astype(np.int16).tobytes()
-                out_pcm_buf.extend(pcm16)
-
-                while len(out_pcm_buf) >= chunk_bytes_target:
-                    chunk = bytes(out_pcm_buf[:chunk_bytes_target])
-                    del out_pcm_buf[:chunk_bytes_target]
-                    b64 = base64.b64encode(chunk).decode("ascii")
-                    service.stdin.write(
-                        json.dumps(
-                            _req(
-                                "stream_push",
-                                {
-                                    "session_id": session_id,
-                                    "format": "pcm_s16le_b64",
-                                    "audio_b64": b64,
-                                },
-                            )
-                        )
-                        + "\n"
-                    )
-                    service.stdin.flush()
-
-                    line = service.stdout.readline().strip()
-                    if not line:
-                        continue
-                    resp = json.loads(line)
-                    result = resp.get("result") or {}
-                    kind = result.get("kind")
-                    text = result.get("text")
-                    actions = result.get("actions")
-                    if kind in ("partial", "final") and text:
-                        sys.stderr.write(f"[{kind}] {text}\n")
-                    if actions:
-                        sys.stderr.write(f"[{kind}:actions] {actions}\n")
+                if resampler is None:
+                    y = _float32_to_s16(batch[:n], batch_i16)
+                else:
+                    y = resampler.process_s16(batch[:n])
+                off = 0
+                while off < y.size:
+                    k = min(chunk_samples - filled, int(y.size) - off)
+                    pending[filled : filled + k] = y[off : off + k]
+                    filled += k
+                    off += k
+                    if filled == chunk_samples:
+                        chunks.put(pending.tobytes())
+                        filled = 0
 
     except KeyboardInterrupt:
         pass
@@ -263,31 +794,18 @@ def main() -> int:
         stop.set()
 
     # Finalize any remaining audio.
-    if out_pcm_buf:
-        b64 = base64.b64encode(bytes(out_pcm_buf)).decode("ascii")
-        service.stdin.write(
-            json.dumps(
-                _req(
-                    "stream_push",
-                    {
-                        "session_id": session_id,
-                        "format": "pcm_s16le_b64",
-                        "audio_b64": b64,
-                    },
-                )
-            )
-            + "\n"
-        )
-        service.stdin.flush()
-        _ = service.stdout.readline()
-
-    service.stdin.write(
-        json.dumps(_req("stream_finalize", {"session_id": session_id})) + "\n"
-    )
-    service.stdin.flush()
-    final_line = service.stdout.readline().strip()
-    if final_line:
-        final = json.loads(final_line)
+    if filled:
+        chunks.put(pending[:filled].tobytes())
+    chunks.put(None)
+    sender.join()
+
+    if dead.is_set():
+        print("Speech service exited.", file=sys.stderr)
+        return 1
+
+    _send_json(service.stdin, _req("stream_finalize", {"session_id": session_id}))
+    final = replies.get()
+    if final:
         actions = (final.get("result") or {}).get("actions")
         if actions:
             sys.stderr.write(f"[final:actions] {actions}\n")
@@ -2,7 +2,7 @@
 
 """JSpeak local speech service (JSONL over stdin/stdout).
 
-Protocol (each request/response is one JSON line):
+Protocol (each request/response is one UTF-8 JSON line):
 
 Request:
   {"id": "...", "method": "...", "params": {"k": "v", ...}}
@@ -23,7 +23,14 @@ Language:
 
 Partial output:
   - stream_start params.partial_interval_ms (default: 500)
+  - stream_start params.trust_last_partial_on_endpoint (default: true): on an
+    endpoint, finalize the last partial's text instead of transcribing the
+    utterance again when that partial saw the whole utterance and everything
+    after it is the trailing silence
   - stream_push response.result.kind = partial|final|none
+  - requests are answered in order; if more stream_push requests for the same
+    session are already queued, a push skips its partial (kind = none) and
+    leaves it to the newest one
 
 Commands:
   - If a final transcript exactly matches a command phrase, service returns structured actions.
@@ -34,18 +41,46 @@ Audio encoding for stream_push:
   - params.format = "pcm_s16le_b64"
   - params.sample_rate_hz = "16000" (recommended)
   - params.audio_b64 = base64 of raw little-endian int16 PCM mono
+
+Binary stream_push frames (capabilities.binary_push = "true"):
+  - Instead of a JSON line, send: 0x01, u16 LE session id length, u32 LE PCM
+    byte length, the UTF-8 session id, then raw little-endian int16 PCM mono.
+  - The response is the usual stream_push JSON line with "id": "".
+  - Frames and JSON lines may be freely interleaved on stdin.
+
+Length-prefixed JSON (capabilities.framed_json = "true"):
+  - Instead of a JSON line, send: 0x02, u32 BE byte length, then the UTF-8
+    JSON request. No newline scanning; the body may contain raw newlines.
+  - The response is framed the same way: 0x02, u32 BE length, UTF-8 JSON.
+  - May be interleaved with JSON lines and binary push frames.
 """
 
-import base64
 import json
 import os
+import queue
 import re
+import struct
 import sys
+import threading
 import time
-import uuid
 from dataclasses import dataclass, field
 from typing import Any, Dict, Optional, Tuple
 
+import numpy as np
+
+try:
+    from pybase64 import b64decode as _b64decode
+except ImportError:
+    from base64 import b64decode as _b64decode
+
+try:
+    import orjson
+
+    _ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    _ORJSON_AVAILABLE = False
+
 try:
     from user_lexicon import UserLexicon
 
@@ -55,13 +90,54 @@ except ImportError:
     _USER_LEXICON_AVAILABLE = False
 
 
+# Binary stream_push frame: op, session id length, PCM byte length.
+_OP_PUSH = 0x01
+_PUSH_HEADER = struct.Struct("<BHI")
+# Length-prefixed JSON request/response: op, JSON byte length.
+_OP_JSON = 0x02
+_JSON_HEADER = struct.Struct(">BI")
+
+
 def _now() -> float:
     return time.time()
 
 
-def _write(obj):
-    sys.stdout.write(json.dumps(obj, ensure_ascii=True) + "\n")
-    sys.stdout.flush()
+def _new_id() -> str:
+    # 128 random bits as hex, without building a uuid.UUID.
+    return os.urandom(16).hex()
+
+
+def _dumps(obj) -> bytes:
+    # Responses go out as UTF-8 bytes; orjson (when installed) serializes
+    # straight to bytes. Text that can't be UTF-8 encoded (lone surrogates
+    # from escaped input) falls back to ASCII-escaped stdlib JSON.
+    try:
+        if _ORJSON_AVAILABLE:
+            return orjson.dumps(obj)
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+    except (TypeError, UnicodeEncodeError):
+        return json.dumps(obj, ensure_ascii=True).encode("ascii")
+
+
+def _loads(line: bytes):
+    if _ORJSON_AVAILABLE:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+_write_lock = threading.Lock()
+
+
+def _write(obj, framed: bool = False):
+    data = _dumps(obj)
+    if framed:
+        data = _JSON_HEADER.pack(_OP_JSON, len(data)) + data
+    else:
+        data += b"\n"
+    out = sys.stdout.buffer
+    with _write_lock:
+        out.write(data)
+        out.flush()
 
 
 def _ok(req_id: str, result: Optional[dict] = None):
@@ -111,69 +187,79 @@ def _normalize_language(language: Optional[str], mixed: bool) -> Optional[str]:
     return language
 
 
+_PROMPT_EN = "Transcribe accurately. Keep punctuation and casing."
+# Non-ASCII here is intentional: it improves Chinese punctuation/formatting.
+_PROMPT_ZH = (
+    "请优先使用简体中文标点与表达，保留英文单词/缩写原样，必要时中英文之间加空格。"
+)
+
+
 def _default_prompt_for(language: Optional[str]) -> Optional[str]:
-    # Non-ASCII here is intentional: it improves Chinese punctuation/formatting.
-    if language == "en":
-        return "Transcribe accurately. Keep punctuation and casing."
-    return (
-        "请优先使用简体中文标点与表达，保留英文单词/缩写原样，必要时中英文之间加空格。"
-    )
+    return _PROMPT_EN if language == "en" else _PROMPT_ZH
 
 
-_RE_CJK_ASCII = re.compile(r"([\u4e00-\u9fff])([A-Za-z0-9])")
-_RE_ASCII_CJK = re.compile(r"([A-Za-z0-9])([\u4e00-\u9fff])")
+# Empty match at every CJK/ASCII-alnum boundary, in either direction, so one
+# sub() pass inserts all the spaces.
+_RE_MIXED_BOUNDARY = re.compile(
+    r"(?<=[\u4e00-\u9fff])(?=[A-Za-z0-9])|(?<=[A-Za-z0-9])(?=[\u4e00-\u9fff])"
+)
 
 
 def _normalize_mixed_spacing(text: str) -> str:
     # Light post-process to improve ZH+EN readability.
-    text = _RE_CJK_ASCII.sub(r"\1 \2", text)
-    text = _RE_ASCII_CJK.sub(r"\1 \2", text)
-    return text
+    if text.isascii():
+        return text  # no CJK to space against
+    return _RE_MIXED_BOUNDARY.sub(" ", text)
 
 
-_RE_END_PUNCT = re.compile(r"[\.!\?\u3002\uff01\uff1f\u2026]+$")
-_RE_TRAILING_PUNCT = re.compile(r"[\.!\?\u3002\uff01\uff1f\u2026]+$")
+# Sentence-final punctuation. Only ever probed at the (stripped) tail, so
+# str.rstrip / t[-1] replace "[...]+$" regexes that try every position.
+_END_PUNCT = ".!?\u3002\uff01\uff1f\u2026"
 _RE_CN_COMMA = re.compile(r"[\uff0c,]")
 _RE_CN_CONNECTOR = re.compile(
     r"(但是|不过|然后|所以|因此|而且|并且|同时|另外|因为|如果|虽然|接着|随后)"
 )
+_RE_HAS_CJK = re.compile(r"[\u4e00-\u9fff]")
+_RE_Q_CN_AB = re.compile(r"(是不是|是否|能不能|可不可以|可以吗|要不要|需不需要|有没有)")
+_RE_Q_CN_WH = re.compile(
+    r"^(怎么|为什么|为啥|多少|几|哪(里|儿|个|些|种|位)?|谁|啥|什么|何时|什么时候)"
+)
+_RE_Q_EN = re.compile(
+    r"^(can|could|would|should|do|does|did|is|are|am|was|were|what|why|how|when|where|which|who)\b"
+)
 
 
 def _looks_like_question(text: str) -> bool:
     t = text.strip()
     if not t:
         return False
-    t = _RE_TRAILING_PUNCT.sub("", t).strip()
+    t = t.rstrip(_END_PUNCT).strip()
     if not t:
         return False
 
     lower = t.lower()
 
     # Strong Chinese question cues.
-    if re.search(r"(吗|么)\s*$", t):
+    if t[-1] in "吗么":
         return True
-    if re.search(r"(是不是|是否|能不能|可不可以|可以吗|要不要|需不需要|有没有)", t):
+    if _RE_Q_CN_AB.search(t):
         return True
-    if re.match(
-        r"^(怎么|为什么|为啥|多少|几|哪(里|儿|个|些|种|位)?|谁|啥|什么|何时|什么时候)",
-        t,
-    ):
+    if _RE_Q_CN_WH.match(t):
         return True
 
     # English question cues.
-    if re.match(
-        r"^(can|could|would|should|do|does|did|is|are|am|was|were|what|why|how|when|where|which|who)\b",
-        lower,
-    ):
+    if _RE_Q_EN.match(lower):
         return True
 
     return False
 
 
-def _maybe_insert_cn_comma(text: str) -> str:
+def _maybe_insert_cn_comma(text: str, has_cjk: Optional[bool] = None) -> str:
     if not text:
         return text
-    if not re.search(r"[\u4e00-\u9fff]", text):
+    if has_cjk is None:
+        has_cjk = bool(_RE_HAS_CJK.search(text))
+    if not has_cjk:
         return text
     if _RE_CN_COMMA.search(text):
         return text
@@ -192,14 +278,15 @@ def _apply_tone_punctuation(text: str) -> str:
     t = text.strip()
     if not t:
         return t
-    has_cjk = bool(re.search(r"[\u4e00-\u9fff]", t))
-    base = _RE_TRAILING_PUNCT.sub("", t).strip()
+    has_cjk = bool(_RE_HAS_CJK.search(t))
+    base = t.rstrip(_END_PUNCT).strip()
     if not base:
         return t
-    base = _maybe_insert_cn_comma(base)
+    # Trailing punctuation is never CJK, so has_cjk holds for base too.
+    base = _maybe_insert_cn_comma(base, has_cjk)
     if _looks_like_question(base):
         return base + ("？" if has_cjk else "?")
-    if _RE_END_PUNCT.search(t):
+    if t[-1] in _END_PUNCT:
         if has_cjk and t.endswith("."):
             return base + "。"
         return t
@@ -210,12 +297,19 @@ def _clean_command_text(text: str) -> str:
     return text.strip().strip("\r\n\t ,.!?;:，。！？；：")
 
 
+# Characters dropped from command keys: all whitespace (what regex \s matches;
+# the last one is U+3000) plus ASCII and fullwidth punctuation.
+_CMD_STRIP_TABLE = dict.fromkeys(
+    [c for c in range(0x3001) if chr(c).isspace()]
+    + list(map(ord, ",.!?;:\uff0c\u3002\uff01\uff1f\uff1b\uff1a")),
+    None,
+)
+
+
 def _command_key(text: str) -> str:
     # Normalize to match spoken config phrases.
     # Remove spaces and punctuation so minor ASR differences don't inject text.
-    t = _clean_command_text(text).lower()
-    t = re.sub(r"[\s,\.\!\?;:\uff0c\u3002\uff01\uff1f\uff1b\uff1a]", "", t)
-    return t
+    return _clean_command_text(text).lower().translate(_CMD_STRIP_TABLE)
 
 
 _SUPPRESSED_KEYS = {
@@ -229,39 +323,34 @@ def _is_suppressed_phrase(text: str) -> bool:
     return _command_key(text) in _SUPPRESSED_KEYS
 
 
-def _command_actions(text: str) -> Optional[list]:
-    t = _clean_command_text(text).lower()
-    if not t:
-        return None
-
-    # Spoken prompt/config phrases: do not insert as text.
-    # (We already apply this behavior via initial_prompt by default.)
-    if _is_suppressed_phrase(t):
-        return []
-
-    if t in ("换行", "回车", "下一行", "new line", "newline", "enter"):
-        return [{"type": "insert", "text": "\n"}]
-
-    if t in ("空格", "space"):
-        return [{"type": "insert", "text": " "}]
-
-    if t in ("删除", "退格", "backspace", "delete"):
-        return [{"type": "delete_backward", "count": 1}]
-
-    if t in ("删除一个词", "删除上一个词", "delete word", "delete last word"):
-        return [{"type": "delete_backward_word", "count": 1}]
-
-    if t in ("删除一句", "删除上一句", "delete sentence", "delete last sentence"):
-        return [{"type": "delete_backward_sentence", "count": 1}]
-
-    if t in ("撤销", "undo"):
-        return [{"type": "system_undo"}]
-
-    if t in ("重做", "redo"):
-        return [{"type": "system_redo"}]
-
-    if t in ("清空", "清除", "clear"):
-        return [{"type": "clear"}]
+def _build_command_table() -> Dict[str, list]:
+    # Spoken command phrase (already cleaned and lowercased) -> actions. The
+    # action lists are shared between calls; callers only serialize them.
+    table: Dict[str, list] = {}
+    for phrases, actions in (
+        (
+            ("换行", "回车", "下一行", "new line", "newline", "enter"),
+            [{"type": "insert", "text": "\n"}],
+        ),
+        (("空格", "space"), [{"type": "insert", "text": " "}]),
+        (
+            ("删除", "退格", "backspace", "delete"),
+            [{"type": "delete_backward", "count": 1}],
+        ),
+        (
+            ("删除一个词", "删除上一个词", "delete word", "delete last word"),
+            [{"type": "delete_backward_word", "count": 1}],
+        ),
+        (
+            ("删除一句", "删除上一句", "delete sentence", "delete last sentence"),
+            [{"type": "delete_backward_sentence", "count": 1}],
+        ),
+        (("撤销", "undo"), [{"type": "system_undo"}]),
+        (("重做", "redo"), [{"type": "system_redo"}]),
+        (("清空", "清除", "clear"), [{"type": "clear"}]),
+    ):
+        for phrase in phrases:
+            table[phrase] = actions
 
     punct_map = {
         "逗号": "，",
@@ -277,10 +366,25 @@ def _command_actions(text: str) -> Optional[list]:
         "colon": ":",
         "semicolon": ";",
     }
-    if t in punct_map:
-        return [{"type": "insert", "text": punct_map[t]}]
+    for phrase, punct in punct_map.items():
+        table[phrase] = [{"type": "insert", "text": punct}]
+    return table
+
 
-    return None
+_COMMAND_TABLE = _build_command_table()
+
+
+def _command_actions(text: str) -> Optional[list]:
+    t = _clean_command_text(text).lower()
+    if not t:
+        return None
+
+    # Spoken prompt/config phrases: do not insert as text.
+    # (We already apply this behavior via initial_prompt by default.)
+    if _is_suppressed_phrase(t):
+        return []
+
+    return _COMMAND_TABLE.get(t)
 
 
 def _compose_actions(kind: str, text: str, actions: list) -> list:
@@ -293,18 +397,17 @@ def _compose_actions(kind: str, text: str, actions: list) -> list:
 
 
 def _decode_pcm_s16le_b64(audio_b64: str) -> "bytes":
-    return base64.b64decode(audio_b64.encode("ascii"), validate=True)
+    # b64decode takes the str directly; audio comes from our own clients, so
+    # skip the validate=True rescan.
+    return _b64decode(audio_b64)
 
 
 def _pcm16_bytes_to_float32_mono(pcm16: bytes):
-    # Lazy import to keep startup fast when only ping/capabilities is used.
-    import numpy as np
-
     arr = np.frombuffer(pcm16, dtype=np.int16)
     if arr.size == 0:
         return np.zeros((0,), dtype=np.float32)
-    # int16 -> [-1, 1)
-    return (arr.astype(np.float32) / 32768.0).copy()
+    # int16 -> [-1, 1) in one fused pass into a freshly owned array.
+    return np.multiply(arr, np.float32(1.0 / 32768.0), dtype=np.float32)
 
 
 class EnergyVAD:
@@ -322,26 +425,27 @@ class EnergyVAD:
         self.rms_threshold = rms_threshold
 
     def is_speech(self, frame_f32) -> bool:
-        import numpy as np
-
         if frame_f32.size == 0:
             return False
         rms = float(np.sqrt(np.mean(frame_f32 * frame_f32)))
         return rms >= self.rms_threshold
 
 
-@dataclass
+@dataclass(slots=True)
 class StreamSession:
     sample_rate_hz: int
     language: Optional[str] = None
     prompt: Optional[str] = None
     created_at: float = field(default_factory=_now)
-    # Audio accumulation
+    # Audio accumulation: buffer_f32[:buffer_len] is the current utterance;
+    # the array grows geometrically and is reused across utterances.
     buffer_f32: Any = None
+    buffer_len: int = 0
     # Endpointing
     vad: EnergyVAD = None  # type: ignore[assignment]
     speech_frames: int = 0
     silence_frames: int = 0
+    first_speech_sample: int = -1
     last_emitted_text: str = ""
     segments_text: str = ""
     # Partial output
@@ -349,55 +453,105 @@ class StreamSession:
     max_partial_context_s: int = 20
     min_partial_speech_ms: int = 300
     last_partial_samples: int = 0
+    # buffer_len when the partial that produced last_emitted_text ran.
+    emitted_partial_samples: int = 0
     committed_prefix: str = ""
+    # len(committed_prefix) when last_emitted_text was emitted; both strings it
+    # is diffed against start with that prefix, so it's a known common prefix.
+    emitted_prefix_len: int = 0
     last_prefix_candidate: str = ""
     prefix_streak: int = 0
     # Config
     frame_ms: int = 30
     end_silence_ms: int = 450
+    trust_last_partial_on_endpoint: bool = True
+    # Derived from the config above in __post_init__ (fixed per session).
+    frame_len: int = field(init=False, default=0)
+    interval_samples: int = field(init=False, default=0)
+    max_partial_context_samples: int = field(init=False, default=0)
+    end_silence_frames: int = field(init=False, default=0)
+    min_partial_speech_frames: int = field(init=False, default=0)
 
     def __post_init__(self):
-        import numpy as np
-
-        self.buffer_f32 = np.zeros((0,), dtype=np.float32)
+        self.buffer_f32 = np.empty((0,), dtype=np.float32)
+        self.buffer_len = 0
         self.vad = EnergyVAD(self.sample_rate_hz, frame_ms=self.frame_ms)
+        self.frame_len = int(self.sample_rate_hz * (self.frame_ms / 1000.0))
+        self.interval_samples = int(
+            self.sample_rate_hz * (self.partial_interval_ms / 1000.0)
+        )
+        self.max_partial_context_samples = int(
+            self.max_partial_context_s * self.sample_rate_hz
+        )
+        # Frame counts meeting the ms thresholds (ceil, so `frames >= n` is
+        # exactly `frames * frame_ms >= ms`).
+        self.end_silence_frames = -(-self.end_silence_ms // self.frame_ms)
+        self.min_partial_speech_frames = -(-self.min_partial_speech_ms // self.frame_ms)
 
     def reset_current_utterance(self):
-        import numpy as np
-
-        self.buffer_f32 = np.zeros((0,), dtype=np.float32)
+        self.buffer_len = 0
         self.speech_frames = 0
         self.silence_frames = 0
+        self.first_speech_sample = -1
         self.last_emitted_text = ""
         self.last_partial_samples = 0
+        self.emitted_partial_samples = 0
         self.committed_prefix = ""
+        self.emitted_prefix_len = 0
         self.last_prefix_candidate = ""
         self.prefix_streak = 0
 
-    def push_audio(self, audio_f32) -> Tuple[bool, int, int]:
-        import numpy as np
+    def speech_start(self) -> int:
+        # Where to start feeding Whisper: 100 ms before the first speech frame,
+        # so leading silence isn't decoded (all of it if no speech yet).
+        if self.first_speech_sample < 0:
+            return 0
+        return max(0, self.first_speech_sample - self.sample_rate_hz // 10)
 
+    def push_audio(self, audio_f32) -> Tuple[bool, int, int]:
         if audio_f32.size == 0:
             return False, self.speech_frames, self.silence_frames
 
-        self.buffer_f32 = np.concatenate((self.buffer_f32, audio_f32))
+        # VAD runs on the fresh chunk first, while it's still hot in cache;
+        # appending to the utterance buffer is the only copy made.
+        endpoint = self._update_vad(audio_f32, self.buffer_len)
+        self._append(audio_f32)
+        return endpoint, self.speech_frames, self.silence_frames
 
-        frame_len = int(self.sample_rate_hz * (self.frame_ms / 1000.0))
+    def _append(self, audio_f32):
+        needed = self.buffer_len + audio_f32.size
+        if needed > self.buffer_f32.size:
+            grown = np.empty((max(2 * self.buffer_f32.size, needed),), np.float32)
+            grown[: self.buffer_len] = self.buffer_f32[: self.buffer_len]
+            self.buffer_f32 = grown
+        self.buffer_f32[self.buffer_len : needed] = audio_f32
+        self.buffer_len = needed
+
+    def _update_vad(self, audio_f32, chunk_base: int) -> bool:
+        # chunk_base: buffer offset audio_f32 will be appended at.
+        frame_len = self.frame_len
         if frame_len <= 0:
-            return False, self.speech_frames, self.silence_frames
+            return False
 
         # Analyze only the newest whole frames.
         n_frames = int(audio_f32.size // frame_len)
         if n_frames <= 0:
-            return False, self.speech_frames, self.silence_frames
+            return False
 
         # Take the tail portion that aligns with frames.
         start = audio_f32.size - (n_frames * frame_len)
         frames = audio_f32[start:].reshape((n_frames, frame_len))
 
+        # Per-frame RMS for all frames in one vectorized pass; same decision
+        # as EnergyVAD.is_speech, without a NumPy call per frame.
+        rms = np.sqrt((frames * frames).mean(axis=1))
+        is_speech = (rms >= self.vad.rms_threshold).tolist()
+
         endpoint = False
-        for i in range(n_frames):
-            if self.vad.is_speech(frames[i]):
+        for i, speech in enumerate(is_speech):
+            if speech:
+                if self.first_speech_sample < 0:
+                    self.first_speech_sample = chunk_base + start + i * frame_len
                 self.speech_frames += 1
                 self.silence_frames = 0
             else:
@@ -405,54 +559,40 @@ class StreamSession:
                 # End-of-utterance when we've seen some speech and enough silence.
                 if (
                     self.speech_frames > 0
-                    and (self.silence_frames * self.frame_ms) >= self.end_silence_ms
+                    and self.silence_frames >= self.end_silence_frames
                 ):
                     endpoint = True
-
-        return endpoint, self.speech_frames, self.silence_frames
+        return endpoint
+
+
+def _common_prefix_len(a: str, b: str, known: int = 0) -> int:
+    # Bisect on slice equality: each comparison is a C-level memcmp, so this
+    # is O(log n) interpreter steps instead of one per character. The caller
+    # may pass `known`, a length a[:known] == b[:known] is guaranteed for;
+    # only the rest is compared.
+    lo, hi = min(known, len(a), len(b)), min(len(a), len(b))
+    if a[lo:hi] == b[lo:hi]:
+        return hi
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
 
 
-def _common_prefix_len(a: str, b: str) -> int:
-    n = min(len(a), len(b))
-    i = 0
-    while i < n and a[i] == b[i]:
-        i += 1
-    return i
+_BOUNDARY_CHARS = " \t\n\r,.!?;:，。！？；："
 
 
 def _boundary_prefix(text: str) -> str:
     # Return a prefix that ends at a natural boundary (space / newline / punctuation).
-    if not text:
-        return ""
-
-    boundary_chars = set(
-        [
-            " ",
-            "\t",
-            "\n",
-            "\r",
-            ",",
-            ".",
-            "!",
-            "?",
-            ";",
-            ":",
-            "，",
-            "。",
-            "！",
-            "？",
-            "；",
-            "：",
-        ]
-    )
-
-    i = len(text) - 1
-    while i >= 0:
-        ch = text[i]
-        if ch in boundary_chars:
-            return text[: i + 1]
-        i -= 1
-    return ""
+    idx = -1
+    for c in _BOUNDARY_CHARS:
+        j = text.rfind(c)
+        if j > idx:
+            idx = j
+    return text[: idx + 1] if idx >= 0 else ""
 
 
 class WhisperEngine:
@@ -502,6 +642,10 @@ class WhisperEngine:
         if language:
             kwargs["language"] = language
         if prompt:
+            # mlx_whisper.transcribe only takes the prompt as text: it encodes it
+            # itself (with an lru_cached tokenizer) and overwrites
+            # decode_options["prompt"] per segment, so there are no prompt ids
+            # to pass in. Encoding one short string costs microseconds.
             kwargs["initial_prompt"] = prompt
 
         model = self._model_name
@@ -525,8 +669,182 @@ class Service:
         else:
             self.user_lexicon = None
 
-    def handle(self, req: dict) -> dict:
-        req_id = req.get("id") or str(uuid.uuid4())
+    def handle_push_frame(
+        self, session_id: str, pcm16: bytes, allow_partial: bool = True
+    ) -> dict:
+        # Binary stream_push frames carry no request id.
+        if not session_id or session_id not in self.sessions:
+            return _err("", "Unknown session_id")
+        try:
+            return self._stream_push("", session_id, pcm16, allow_partial)
+        except Exception as e:
+            return _err("", str(e))
+
+    def _stream_push(
+        self, req_id: str, session_id: str, pcm16: bytes, allow_partial: bool = True
+    ) -> dict:
+        # allow_partial=False still buffers the audio, runs VAD and finalizes on
+        # an endpoint, but skips the partial transcribe (newer audio is queued).
+        audio_f32 = _pcm16_bytes_to_float32_mono(pcm16)
+        sess: StreamSession = self.sessions[session_id]
+        endpoint, speech_frames, silence_frames = sess.push_audio(audio_f32)
+
+        emitted_text = ""
+        emitted_final = "false"
+        emitted_kind = "none"
+        committed_text = ""
+        stable_prefix = ""
+        unstable_suffix = ""
+        delta_from = "0"
+        delta_delete = "0"
+        delta_insert = ""
+        actions = []
+
+        # Partial: transcribe periodically while speech is ongoing.
+        if not endpoint and speech_frames > 0 and allow_partial:
+            if speech_frames < sess.min_partial_speech_frames:
+                sess.last_partial_samples = sess.buffer_len
+                return _ok(
+                    req_id,
+                    {
+                        "session_id": session_id,
+                        "endpoint": "false",
+                        "speech_frames": str(speech_frames),
+                        "silence_frames": str(silence_frames),
+                        "text": "",
+                        "final": "false",
+                        "kind": "none",
+                        "committed_text": "",
+                        "actions": [],
+                        "stable_prefix": "",
+                        "unstable_suffix": "",
+                        "delta_from": "0",
+                        "delta_delete": "0",
+                        "delta_insert": "",
+                    },
+                )
+            interval_samples = sess.interval_samples
+            if (
+                interval_samples > 0
+                and (sess.buffer_len - sess.last_partial_samples) >= interval_samples
+            ):
+                start = max(
+                    sess.speech_start(),
+                    sess.buffer_len - sess.max_partial_context_samples,
+                )
+                window = sess.buffer_f32[start : sess.buffer_len]
+                text = self.engine.transcribe(
+                    window, sess.sample_rate_hz, sess.language, sess.prompt
+                )
+                if text:
+                    # Stabilize prefix to reduce jitter.
+                    candidate = _boundary_prefix(text)
+                    if candidate and candidate == sess.last_prefix_candidate:
+                        sess.prefix_streak += 1
+                    else:
+                        sess.last_prefix_candidate = candidate
+                        sess.prefix_streak = 1 if candidate else 0
+
+                    if candidate and sess.prefix_streak >= 2:
+                        # Monotonic growth only.
+                        if len(candidate) > len(
+                            sess.committed_prefix
+                        ) and candidate.startswith(sess.committed_prefix):
+                            sess.committed_prefix = candidate
+
+                    stable_prefix = sess.committed_prefix
+                    unstable_suffix = text[len(stable_prefix) :]
+                    full_text = stable_prefix + unstable_suffix
+
+                    prev = sess.last_emitted_text
+                    # Committed text only grows, so prev and full_text share
+                    # the prefix committed when prev was emitted.
+                    cpl = _common_prefix_len(prev, full_text, sess.emitted_prefix_len)
+                    delta_from = str(cpl)
+                    delta_delete = str(len(prev) - cpl)
+                    delta_insert = full_text[cpl:]
+
+                    if full_text != prev:
+                        emitted_text = full_text
+                        sess.last_emitted_text = full_text
+                        sess.emitted_prefix_len = len(stable_prefix)
+                        emitted_kind = "partial"
+                    # last_emitted_text is now this window's transcript.
+                    sess.emitted_partial_samples = sess.buffer_len
+                sess.last_partial_samples = sess.buffer_len
+
+        # Final: on endpoint, transcribe full utterance and reset. If the last
+        # partial's window held the whole utterance and all audio after it is
+        # the trailing silence that triggered the endpoint, reuse its text.
+        # (One frame of slack: the VAD skips a chunk's sub-frame remainder.)
+        if endpoint:
+            if (
+                sess.trust_last_partial_on_endpoint
+                and sess.last_emitted_text
+                and sess.buffer_len - sess.speech_start()
+                <= sess.max_partial_context_samples
+                and sess.buffer_len - sess.emitted_partial_samples
+                <= (silence_frames + 1) * sess.frame_len
+            ):
+                text = sess.last_emitted_text
+            else:
+                text = self.engine.transcribe(
+                    sess.buffer_f32[sess.speech_start() : sess.buffer_len],
+                    sess.sample_rate_hz,
+                    sess.language,
+                    sess.prompt,
+                )
+            text = _normalize_mixed_spacing(text)
+            is_command = False
+            actions = _command_actions(text)
+            if actions is not None:
+                is_command = True
+            else:
+                text = _apply_tone_punctuation(text)
+                actions = [{"type": "insert", "text": text}] if text else []
+            stable_prefix = ""
+            unstable_suffix = ""
+            emitted_text = text
+            committed_text = "" if is_command else text
+            prev = sess.last_emitted_text
+            cpl = _common_prefix_len(prev, text)
+            delta_from = str(cpl)
+            delta_delete = str(len(prev) - cpl)
+            delta_insert = text[cpl:]
+            emitted_final = "true"
+            emitted_kind = "final"
+            if text:
+                sess.segments_text = text
+            sess.reset_current_utterance()
+
+        # Normalize actions for a 2-stage IME (composition -> commit)
+        if emitted_kind == "partial":
+            actions = _compose_actions("partial", emitted_text, actions)
+        elif emitted_kind == "final":
+            actions = _compose_actions("final", emitted_text, actions)
+
+        return _ok(
+            req_id,
+            {
+                "session_id": session_id,
+                "endpoint": "true" if endpoint else "false",
+                "speech_frames": str(speech_frames),
+                "silence_frames": str(silence_frames),
+                "text": emitted_text,
+                "final": emitted_final,
+                "kind": emitted_kind,
+                "committed_text": committed_text,
+                "actions": actions,
+                "stable_prefix": stable_prefix,
+                "unstable_suffix": unstable_suffix,
+                "delta_from": delta_from,
+                "delta_delete": delta_delete,
+                "delta_insert": delta_insert,
+            },
+        )
+
+    def handle(self, req: dict, allow_partial: bool = True) -> dict:
+        req_id = req.get("id") or _new_id()
         method = req.get("method")
         params = req.get("params") or {}
         if not isinstance(params, dict):
@@ -553,11 +871,13 @@ class Service:
                         "default_language": "zh",
                         "language_modes": "zh,auto,en",
                         "mixed_mode": "true",
+                        "binary_push": "true",
+                        "framed_json": "true",
                     },
                 )
 
             if method == "stream_start":
-                session_id = _get_str(params, "session_id") or str(uuid.uuid4())
+                session_id = _get_str(params, "session_id") or _new_id()
                 sample_rate_hz = int(
                     _get_str(params, "sample_rate_hz", "16000") or "16000"
                 )
@@ -598,6 +918,9 @@ class Service:
                     _get_str(params, "min_partial_speech_ms", "300") or "300"
                 )
                 end_silence_ms = int(_get_str(params, "end_silence_ms", "450") or "450")
+                trust_last_partial = _get_bool(
+                    params, "trust_last_partial_on_endpoint", default=True
+                )
                 sess = StreamSession(
                     sample_rate_hz=sample_rate_hz,
                     language=language,
@@ -606,6 +929,7 @@ class Service:
                     max_partial_context_s=max_partial_context_s,
                     min_partial_speech_ms=min_partial_speech_ms,
                     end_silence_ms=end_silence_ms,
+                    trust_last_partial_on_endpoint=trust_last_partial,
                 )
                 self.sessions[session_id] = sess
                 return _ok(req_id, {"session_id": session_id, "model": model})
@@ -622,148 +946,7 @@ class Service:
                     return _err(req_id, "Missing audio_b64")
 
                 pcm16 = _decode_pcm_s16le_b64(audio_b64)
-                audio_f32 = _pcm16_bytes_to_float32_mono(pcm16)
-                sess: StreamSession = self.sessions[session_id]
-                endpoint, speech_frames, silence_frames = sess.push_audio(audio_f32)
-
-                emitted_text = ""
-                emitted_final = "false"
-                emitted_kind = "none"
-                committed_text = ""
-                stable_prefix = ""
-                unstable_suffix = ""
-                delta_from = "0"
-                delta_delete = "0"
-                delta_insert = ""
-                actions = []
-
-                # Partial: transcribe periodically while speech is ongoing.
-                if not endpoint and speech_frames > 0:
-                    if (speech_frames * sess.frame_ms) < sess.min_partial_speech_ms:
-                        sess.last_partial_samples = int(sess.buffer_f32.size)
-                        return _ok(
-                            req_id,
-                            {
-                                "session_id": session_id,
-                                "endpoint": "false",
-                                "speech_frames": str(speech_frames),
-                                "silence_frames": str(silence_frames),
-                                "text": "",
-                                "final": "false",
-                                "kind": "none",
-                                "committed_text": "",
-                                "actions": [],
-                                "stable_prefix": "",
-                                "unstable_suffix": "",
-                                "delta_from": "0",
-                                "delta_delete": "0",
-                                "delta_insert": "",
-                            },
-                        )
-                    interval_samples = int(
-                        sess.sample_rate_hz * (sess.partial_interval_ms / 1000.0)
-                    )
-                    if (
-                        interval_samples > 0
-                        and (sess.buffer_f32.size - sess.last_partial_samples)
-                        >= interval_samples
-                    ):
-                        start = max(
-                            0,
-                            int(
-                                sess.buffer_f32.size
-                                - (sess.max_partial_context_s * sess.sample_rate_hz)
-                            ),
-                        )
-                        window = sess.buffer_f32[start:]
-                        text = self.engine.transcribe(
-                            window, sess.sample_rate_hz, sess.language, sess.prompt
-                        )
-                        if text:
-                            # Stabilize prefix to reduce jitter.
-                            candidate = _boundary_prefix(text)
-                            if candidate and candidate == sess.last_prefix_candidate:
-                                sess.prefix_streak += 1
-                            else:
-                                sess.last_prefix_candidate = candidate
-                                sess.prefix_streak = 1 if candidate else 0
-
-                            if candidate and sess.prefix_streak >= 2:
-                                # Monotonic growth only.
-                                if len(candidate) > len(
-                                    sess.committed_prefix
-                                ) and candidate.startswith(sess.committed_prefix):
-                                    sess.committed_prefix = candidate
-
-                            stable_prefix = sess.committed_prefix
-                            unstable_suffix = text[len(stable_prefix) :]
-                            full_text = stable_prefix + unstable_suffix
-
-                            prev = sess.last_emitted_text
-                            cpl = _common_prefix_len(prev, full_text)
-                            delta_from = str(cpl)
-                            delta_delete = str(len(prev) - cpl)
-                            delta_insert = full_text[cpl:]
-
-                            if full_text != prev:
-                                emitted_text = full_text
-                                sess.last_emitted_text = full_text
-                                emitted_kind = "partial"
-                        sess.last_partial_samples = int(sess.buffer_f32.size)
-
-                # Final: on endpoint, transcribe full utterance and reset.
-                if endpoint:
-                    text = self.engine.transcribe(
-                        sess.buffer_f32, sess.sample_rate_hz, sess.language, sess.prompt
-                    )
-                    text = _normalize_mixed_spacing(text)
-                    is_command = False
-                    actions = _command_actions(text)
-                    if actions is not None:
-                        is_command = True
-                    else:
-                        text = _apply_tone_punctuation(text)
-                        actions = [{"type": "insert", "text": text}] if text else []
-                    stable_prefix = ""
-                    unstable_suffix = ""
-                    emitted_text = text
-                    committed_text = "" if is_command else text
-                    prev = sess.last_emitted_text
-                    cpl = _common_prefix_len(prev, text)
-                    delta_from = str(cpl)
-                    delta_delete = str(len(prev) - cpl)
-                    delta_insert = text[cpl:]
-                    emitted_final = "true"
-                    emitted_kind = "final"
-                    if text:
-                        sess.segments_text = text
-                    sess.reset_current_utterance()
-
-                # Normalize actions for a 2-stage IME (composition -> commit)
-                if emitted_kind == "partial":
-                    actions = _compose_actions("partial", emitted_text, actions)
-                elif emitted_kind == "final":
-                    actions = _compose_actions("final", emitted_text, actions)
-
-                return _ok(
-                    req_id,
-                    {
-                        "session_id": session_id,
-                        "endpoint": "true" if endpoint else "false",
-                        "speech_frames": str(speech_frames),
-                        "silence_frames": str(silence_frames),
-                        "text": emitted_text,
-                        "final": emitted_final,
-                        "kind": emitted_kind,
-                        "committed_text": committed_text,
-                        "actions": actions,
-                        "stable_prefix": stable_prefix,
-                        "unstable_suffix": unstable_suffix,
-                        "delta_from": delta_from,
-                        "delta_delete": delta_delete,
-                        "delta_insert": delta_insert,
-                    },
-                )
+                return self._stream_push(req_id, session_id, pcm16, allow_partial)
 
             if method == "stream_finalize":
                 session_id = _get_str(params, "session_id")
@@ -774,9 +957,9 @@ class Service:
                 # current utterance buffer. In that case, reuse the last finalized text.
                 text = ""
                 try:
-                    if getattr(sess.buffer_f32, "size", 0) > 0:
+                    if sess.buffer_len > 0:
                         text = self.engine.transcribe(
-                            sess.buffer_f32,
+                            sess.buffer_f32[sess.speech_start() : sess.buffer_len],
                             sess.sample_rate_hz,
                             sess.language,
                             sess.prompt,
@@ -804,18 +987,133 @@ class Service:
             return _err(req_id, str(e))
 
 
+def _read_push_frame(stdin, op: bytes) -> Optional[Tuple[str, bytes]]:
+    header = op + stdin.read(_PUSH_HEADER.size - 1)
+    if len(header) < _PUSH_HEADER.size:
+        return None
+    _, sid_len, pcm_len = _PUSH_HEADER.unpack(header)
+    sid = stdin.read(sid_len)
+    pcm16 = stdin.read(pcm_len)
+    if len(sid) < sid_len or len(pcm16) < pcm_len:
+        return None
+    return sid.decode("utf-8", "replace"), pcm16
+
+
+def _read_json_frame(stdin, op: bytes) -> Optional[bytes]:
+    header = op + stdin.read(_JSON_HEADER.size - 1)
+    if len(header) < _JSON_HEADER.size:
+        return None
+    _, n = _JSON_HEADER.unpack(header)
+    payload = stdin.read(n)
+    if len(payload) < n:
+        return None
+    return payload
+
+
+class _PushBacklog:
+    """Counts stream_push requests queued per session, reader -> worker."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, int] = {}
+
+    def add(self, session_id: str):
+        with self._lock:
+            self._counts[session_id] = self._counts.get(session_id, 0) + 1
+
+    def take(self, session_id: str) -> bool:
+        # Dequeue one push; True if newer pushes for the session are waiting.
+        with self._lock:
+            left = self._counts.get(session_id, 0) - 1
+            if left > 0:
+                self._counts[session_id] = left
+            else:
+                self._counts.pop(session_id, None)
+            return left > 0
+
+
+def _push_session_id(req) -> Optional[str]:
+    if not isinstance(req, dict) or req.get("method") != "stream_push":
+        return None
+    params = req.get("params")
+    if not isinstance(params, dict):
+        return None
+    return _get_str(params, "session_id") or None
+
+
+def _worker_loop(svc: Service, work: "queue.Queue", backlog: _PushBacklog):
+    # Runs every request in arrival order, so replies keep request order and
+    # per-session state is only ever touched from this thread. A partial
+    # transcribe is skipped when newer audio for the session is already
+    # queued; that push still gets its reply, and the newest one decodes.
+    for kind, payload, session_id, framed in iter(work.get, None):
+        allow_partial = session_id is None or not backlog.take(session_id)
+        if kind == "frame":
+            _write(svc.handle_push_frame(*payload, allow_partial=allow_partial))
+            continue
+        if kind == "error":
+            _write(payload, framed)
+            continue
+        try:
+            resp = svc.handle(payload, allow_partial=allow_partial)
+        except Exception as e:
+            resp = _err("", f"Bad request: {e}")
+        _write(resp, framed)
+
+
 def main():
     svc = Service()
-    for line in sys.stdin:
-        line = line.strip()
-        if not line:
+    work: "queue.Queue" = queue.Queue()
+    backlog = _PushBacklog()
+    worker = threading.Thread(
+        target=_worker_loop, args=(svc, work, backlog), daemon=True
+    )
+    worker.start()
+
+    # This thread only reads and parses stdin, so audio keeps being ingested
+    # while the worker is busy transcribing.
+    stdin = sys.stdin.buffer
+    while True:
+        op = stdin.read(1)
+        if not op:
+            break
+        if op[0] == _OP_PUSH:
+            frame = _read_push_frame(stdin, op)
+            if frame is None:
+                break
+            if frame[0]:
+                backlog.add(frame[0])
+            work.put(("frame", frame, frame[0] or None, False))
+            continue
+
+        if op in b"\r\n\t ":
+            # Blank line or stray whitespace between records. Reading on to
+            # the next newline would swallow the following record, which may
+            # be a binary push frame.
             continue
+
+        framed = op[0] == _OP_JSON
+        if framed:
+            line = _read_json_frame(stdin, op)
+            if line is None:
+                break
+        else:
+            line = (op + stdin.readline()).strip()
+            if not line:
+                continue
         try:
-            req = json.loads(line)
-            resp = svc.handle(req)
+            req = _loads(line)
         except Exception as e:
-            resp = _err("", f"Bad request: {e}")
-        _write(resp)
+            work.put(("error", _err("", f"Bad request: {e}"), None, framed))
+            continue
+        session_id = _push_session_id(req)
+        if session_id is not None:
+            backlog.add(session_id)
+        work.put(("request", req, session_id, framed))
+
+    # Answer everything already read before exiting.
+    work.put(None)
+    worker.join()
 
 
 if __name__ == "__main__":
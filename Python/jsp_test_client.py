@@ -15,20 +15,48 @@ Examples:
 
   # Mixed Chinese+English (auto language detection):
   python3 Python/jsp_test_client.py --mixed stream_wav path/to/16k_mono.wav
+
+  # Other rates/channels/formats are converted on the fly with soundfile
+  # (16kHz input) or ffmpeg, whichever is available:
+  python3 Python/jsp_test_client.py stream_wav path/to/44k_stereo.flac
 """
 
-import base64
+import atexit
+import itertools
 import json
+import mmap
+import os
+import shutil
+import struct
 import subprocess
 import sys
 import uuid
 import wave
 
+try:
+    from pybase64 import b64encode as _b64encode
+except ImportError:
+    from base64 import b64encode as _b64encode
+
+try:
+    import soundfile as sf
+
+    _SOUNDFILE_AVAILABLE = True
+except ImportError:
+    sf = None
+    _SOUNDFILE_AVAILABLE = False
+
+try:
+    import orjson
+
+    _ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    _ORJSON_AVAILABLE = False
+
 
 def _service_path() -> str:
     # Resolve relative to this file so it works from any cwd.
-    import os
-
     here = os.path.dirname(os.path.abspath(__file__))
     return os.path.join(here, "jsp_speech_service.py")
 
@@ -36,8 +64,43 @@ def _service_path() -> str:
 SERVICE = _service_path()
 
 
+# Request ids only have to be unique on this one pipe: a per-run nonce plus a
+# counter, instead of a urandom read and UUID formatting per push.
+_NONCE = uuid.uuid4().hex[:8]
+_IDS = itertools.count(1)
+
+
+def _next_id() -> str:
+    return f"{_NONCE}-{next(_IDS)}"
+
+
 def req(method, params=None):
-    return {"id": str(uuid.uuid4()), "method": method, "params": params or {}}
+    return {"id": _next_id(), "method": method, "params": params or {}}
+
+
+def _line(obj) -> bytes:
+    if _ORJSON_AVAILABLE:
+        return orjson.dumps(obj) + b"\n"
+    return json.dumps(obj).encode("utf-8") + b"\n"
+
+
+def _loads(line: bytes):
+    if _ORJSON_AVAILABLE:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+# A push that produced nothing comes back as kind "none" with empty text and
+# no actions; spot it without a parse (orjson and stdlib json spacing).
+_NO_RESULT = (b'"kind":"none"', b'"kind": "none"')
+
+
+# stream_push request with id, session id and base64 audio substituted in; all
+# three are plain ASCII (counter ids, a uuid, base64) and need no JSON escaping.
+PUSH_TMPL = (
+    b'{"id":"%s","method":"stream_push","params":{"session_id":"%s",'
+    b'"format":"pcm_s16le_b64","audio_b64":"%s"}}\n'
+)
 
 
 def parse_flags(argv):
@@ -57,90 +120,198 @@ def parse_flags(argv):
     return mixed, language, i
 
 
+# Binary pipes with a buffer sized for base64 push lines: no TextIOWrapper
+# decode pass and few read()/write() syscalls per request.
+_PIPE_BUFSIZE = 1 << 16
+
+
+# One service process serves every request in this run (model load and
+# imports are paid once); it is respawned if it died and stopped at exit.
+_service_proc = None
+
+
+def _stop_service():
+    if _service_proc is not None and _service_proc.poll() is None:
+        _service_proc.terminate()
+
+
+def _get_service():
+    global _service_proc
+    if _service_proc is None or _service_proc.poll() is not None:
+        if _service_proc is None:
+            atexit.register(_stop_service)
+        _service_proc = subprocess.Popen(
+            [sys.executable, SERVICE],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            bufsize=_PIPE_BUFSIZE,
+            text=False,
+        )
+        if _service_proc.stdin is None or _service_proc.stdout is None:
+            raise RuntimeError("Failed to open subprocess pipes")
+    return _service_proc
+
+
 def run_one(r):
-    p = subprocess.Popen(
-        [sys.executable, SERVICE],
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        text=True,
-    )
-    if p.stdin is None or p.stdout is None:
-        raise RuntimeError("Failed to open subprocess pipes")
-    p.stdin.write(json.dumps(r) + "\n")
+    p = _get_service()
+    p.stdin.write(_line(r))
     p.stdin.flush()
     line = p.stdout.readline().strip()
     if not line:
-        p.terminate()
         raise RuntimeError("No response from service")
-    p.terminate()
     return json.loads(line)
 
 
-def stream_wav(path, mixed: bool, language):
-    with wave.open(path, "rb") as w:
-        if w.getnchannels() != 1:
-            raise SystemExit("wav must be mono")
-        if w.getsampwidth() != 2:
-            raise SystemExit("wav must be 16-bit PCM")
-        sr = w.getframerate()
-        frames = w.readframes(w.getnframes())
-
-    p = subprocess.Popen(
-        [sys.executable, SERVICE],
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        text=True,
+def _wav_data_offset(mm) -> int:
+    # Walk the RIFF chunks to the start of the "data" payload.
+    pos = 12
+    while pos + 8 <= len(mm):
+        cid, size = struct.unpack_from("<4sI", mm, pos)
+        if cid == b"data":
+            return pos + 8
+        pos += 8 + size + (size & 1)
+    raise SystemExit("wav has no data chunk")
+
+
+# The service only accepts 16kHz mono.
+_SERVICE_SR = 16000
+
+# Push in ~300ms chunks. Base64 maps 3 bytes to 4 chars, so with chunks a
+# multiple of 6 bytes (whole samples, whole base64 groups) slicing one
+# encoding of the whole file gives exactly the per-chunk encodings.
+_CHUNK_BYTES = int(_SERVICE_SR * 0.3) * 2
+_CHUNK_BYTES += (-_CHUNK_BYTES) % 6
+
+
+def _wav_chunks(path, n_bytes):
+    # Map the file and base64-encode the PCM straight out of the page cache
+    # instead of first copying all of it into a bytes object.
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        off = _wav_data_offset(mm)
+        with memoryview(mm) as view:
+            encoded = _b64encode(view[off : off + n_bytes])
+
+    # Slices of a memoryview are views, so each chunk is copied only once:
+    # straight into the outgoing request line.
+    encoded = memoryview(encoded)
+    step = _CHUNK_BYTES // 3 * 4
+    for i in range(0, len(encoded), step):
+        yield encoded[i : i + step]
+
+
+def _soundfile_chunks(path):
+    # libsndfile decodes (FLAC, float/24-bit WAV, ...) block by block; only
+    # the channel downmix is done here.
+    with sf.SoundFile(path) as f:
+        mono = f.channels == 1
+        for block in f.blocks(
+            blocksize=_CHUNK_BYTES // 2, dtype="int16", always_2d=not mono
+        ):
+            if not mono:
+                block = block.mean(axis=1).round().astype("<i2")
+            yield _b64encode(block.tobytes())
+
+
+def _ffmpeg_chunks(path):
+    # ffmpeg resamples/downmixes into a pipe; no temp file, no full read.
+    cmd = ["ffmpeg", "-nostdin", "-loglevel", "error", "-i", path]
+    cmd += ["-ac", "1", "-ar", str(_SERVICE_SR), "-f", "s16le", "-"]
+    p = subprocess.Popen(cmd, stdout=subprocess.PIPE, bufsize=_PIPE_BUFSIZE)
+    try:
+        while True:
+            block = p.stdout.read(_CHUNK_BYTES)
+            if not block:
+                break
+            yield _b64encode(block)
+    finally:
+        p.stdout.close()
+        if p.wait() != 0:
+            raise SystemExit(f"ffmpeg could not decode {path}")
+
+
+def _audio_chunks(path):
+    # base64 chunks of 16kHz mono s16le audio for stream_push.
+    try:
+        with wave.open(path, "rb") as w:
+            if (
+                w.getnchannels() == 1
+                and w.getsampwidth() == 2
+                and w.getframerate() == _SERVICE_SR
+            ):
+                return _wav_chunks(path, w.getnframes() * 2)
+    except (wave.Error, EOFError):
+        pass
+
+    sf_rate = None
+    if _SOUNDFILE_AVAILABLE:
+        try:
+            sf_rate = sf.info(path).samplerate
+        except RuntimeError:
+            pass
+        if sf_rate == _SERVICE_SR:
+            return _soundfile_chunks(path)
+    if shutil.which("ffmpeg"):
+        return _ffmpeg_chunks(path)
+    if _SOUNDFILE_AVAILABLE:
+        # soundfile only decodes; resampling needs ffmpeg.
+        if sf_rate is None:
+            raise SystemExit(f"soundfile can't read {path}; install ffmpeg")
+        raise SystemExit(
+            f"{path} is {sf_rate}Hz; install ffmpeg to resample it to 16kHz"
+        )
+    raise SystemExit(
+        "audio must be 16kHz mono 16-bit PCM wav "
+        "(install soundfile or ffmpeg to convert other input)"
     )
-    if p.stdin is None or p.stdout is None:
-        raise RuntimeError("Failed to open subprocess pipes")
+
+
+def stream_wav(path, mixed: bool, language):
+    chunks = _audio_chunks(path)
+
+    p = _get_service()
 
     sid = str(uuid.uuid4())
-    start_params = {"session_id": sid, "sample_rate_hz": str(sr)}
+    start_params = {"session_id": sid, "sample_rate_hz": str(_SERVICE_SR)}
     if mixed:
         start_params["mixed"] = "true"
     if language is not None:
         start_params["language"] = str(language)
-    p.stdin.write(json.dumps(req("stream_start", start_params)) + "\n")
-    p.stdin.flush()
-    _ = p.stdout.readline()
-
-    # Push in ~300ms chunks.
-    chunk_bytes = int(sr * 0.3) * 2
-    for i in range(0, len(frames), chunk_bytes):
-        chunk = frames[i : i + chunk_bytes]
-        b64 = base64.b64encode(chunk).decode("ascii")
-        p.stdin.write(
-            json.dumps(
-                req(
-                    "stream_push",
-                    {"session_id": sid, "format": "pcm_s16le_b64", "audio_b64": b64},
-                )
-            )
-            + "\n"
-        )
+    # Left unflushed: stream_start goes out in the same write() as the first
+    # push, and its reply is read just ahead of that push's.
+    p.stdin.write(_line(req("stream_start", start_params)))
+    start_pending = True
+
+    sid_b = sid.encode("ascii")
+    for b64 in chunks:
+        rid = _next_id().encode("ascii")
+        p.stdin.write(PUSH_TMPL % (rid, sid_b, b64))
         p.stdin.flush()
+        if start_pending:
+            _ = p.stdout.readline()
+            start_pending = False
         resp_line = p.stdout.readline().strip()
-        if resp_line:
-            try:
-                resp = json.loads(resp_line)
-                result = resp.get("result") or {}
-                kind = result.get("kind")
-                text = result.get("text")
-                actions = result.get("actions")
-                if kind in ("partial", "final") and text:
-                    sys.stderr.write(f"[{kind}] {text}\n")
-                if actions:
-                    sys.stderr.write(f"[{kind}:actions] {actions}\n")
-            except Exception:
-                pass
-
-    p.stdin.write(json.dumps(req("stream_finalize", {"session_id": sid})) + "\n")
+        if not resp_line or any(n in resp_line for n in _NO_RESULT):
+            continue
+        try:
+            resp = _loads(resp_line)
+            result = resp.get("result") or {}
+            kind = result.get("kind")
+            text = result.get("text")
+            actions = result.get("actions")
+            if kind in ("partial", "final") and text:
+                sys.stderr.write(f"[{kind}] {text}\n")
+            if actions:
+                sys.stderr.write(f"[{kind}:actions] {actions}\n")
+        except Exception:
+            pass
+
+    p.stdin.write(_line(req("stream_finalize", {"session_id": sid})))
     p.stdin.flush()
+    if start_pending:
+        _ = p.stdout.readline()
     line = p.stdout.readline().strip()
     if not line:
-        p.terminate()
         raise RuntimeError("No response from service")
-    p.terminate()
     resp = json.loads(line)
     actions = (resp.get("result") or {}).get("actions")
     if actions:
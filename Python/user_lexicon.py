@@ -1,13 +1,65 @@
 #!/usr/bin/env python3
 
+import atexit
+import heapq
 import json
 import os
 import re
 import time
-from collections import Counter
+from collections import Counter, deque
 from pathlib import Path
 from typing import Dict, List, Optional, Set
 
+try:
+    import orjson
+
+    _ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    _ORJSON_AVAILABLE = False
+
+# Number of recent transcripts kept; the append-only side-file is compacted
+# back down to this once it holds twice as many lines.
+_MAX_HISTORY = 500
+
+# The file is rewritten after this many unsaved transcripts, or on the first
+# transcript this many seconds after the last write; flush() covers the rest.
+_SAVE_EVERY = 10
+_SAVE_INTERVAL = 5.0
+
+# Soft cap on learned hotwords. Past it, the rarest and least recently seen
+# entries are evicted down to _MAX_HOTWORDS - _EVICT_HOTWORDS.
+_MAX_HOTWORDS = 5000
+_EVICT_HOTWORDS = 500
+
+# Every candidate pattern needs at least one ASCII letter.
+_RE_ASCII_LETTER = re.compile(r"[A-Za-z]")
+_RE_CAMEL = re.compile(r"\b[A-Z][A-Za-z0-9_\-]{2,}\b")
+_RE_ACRONYM = re.compile(r"\b[A-Z]{2,}\b")
+_RE_MIXED = re.compile(r"[A-Za-z]+[0-9]+|[0-9]+[A-Za-z]+")
+_RE_CN_EN = re.compile(r"[\u4e00-\u9fff]{2,}[A-Za-z]{2,}")
+
+
+# The lexicon file is compact JSON; set JSPEAK_LEXICON_PRETTY=1 to have it
+# written indented for reading by hand.
+_PRETTY = os.environ.get("JSPEAK_LEXICON_PRETTY") == "1"
+
+
+def _dumps(obj, pretty: bool = False) -> bytes:
+    if _ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else None)
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _write_atomic(path: Path, payload: bytes):
+    # Write-then-rename so a crash mid-write never truncates the file.
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
 
 class UserLexicon:
     def __init__(self, lexicon_path: Optional[str] = None):
@@ -17,16 +69,25 @@ class UserLexicon:
             support_dir = Path.home() / "Library" / "Application Support" / "JSpeak"
             support_dir.mkdir(parents=True, exist_ok=True)
             self.lexicon_path = support_dir / "user_lexicon.json"
+        self.transcripts_path = self.lexicon_path.with_suffix(".transcripts.jsonl")
 
+        fresh = not self.lexicon_path.exists()
         self.data = self._load()
+        self._migrate()
+
+        self._dirty = 0
+        self._last_save = 0.0
+        self._transcript_lines = 0
+        self.data["transcripts"] = self._load_transcripts(fresh)
+        atexit.register(self.flush)
 
     def _load(self) -> dict:
         if not self.lexicon_path.exists():
             return {
                 "version": "1.0",
                 "hotwords": {},
+                "last_seen": {},
                 "corrections": {},
-                "transcripts": [],
                 "stats": {"total_transcripts": 0, "last_hotword_update": 0},
             }
         try:
@@ -36,64 +97,167 @@ class UserLexicon:
             return {
                 "version": "1.0",
                 "hotwords": {},
+                "last_seen": {},
                 "corrections": {},
-                "transcripts": [],
                 "stats": {"total_transcripts": 0, "last_hotword_update": 0},
             }
 
+    def _migrate(self):
+        # Files written before the flat schema keep
+        # {"word": {"count": n, "last_seen": ts}}; split them into
+        # {"word": n} plus a sidecar last_seen map.
+        hotwords = self.data.get("hotwords") or {}
+        last_seen = self.data.get("last_seen") or {}
+        counts = Counter()
+        for word, entry in hotwords.items():
+            if isinstance(entry, dict):
+                counts[word] = entry.get("count", 0)
+                if "last_seen" in entry:
+                    last_seen[word] = entry["last_seen"]
+            else:
+                counts[word] = entry
+        self.data["hotwords"] = counts
+        self.data["last_seen"] = last_seen
+
+    def _load_transcripts(self, fresh: bool) -> deque:
+        # Recent transcripts live in an append-only JSONL side-file; older
+        # lexicon files still carry them inline under "transcripts".
+        legacy = self.data.pop("transcripts", None) or []
+        # Bounded in memory: appending past the cap evicts the oldest entry.
+        transcripts = deque(legacy, maxlen=_MAX_HISTORY)
+        if fresh:
+            # Deleting user_lexicon.json resets everything, side-file included.
+            if self.transcripts_path.exists():
+                self._compact_transcripts(transcripts)
+            return transcripts
+
+        torn = False
+        try:
+            with open(self.transcripts_path, "rb") as f:
+                for line in f:
+                    try:
+                        transcripts.append(json.loads(line))
+                    except ValueError:
+                        # Torn line from an interrupted append; rewrite the
+                        # file so the next append starts on a clean line.
+                        torn = True
+                        continue
+                    self._transcript_lines += 1
+        except OSError:
+            pass
+
+        if legacy or torn:
+            self._compact_transcripts(transcripts)
+        if legacy:
+            self._save()
+        return transcripts
+
+    def _append_transcript(self, entry: dict):
+        try:
+            with open(self.transcripts_path, "ab") as f:
+                f.write(_dumps(entry) + b"\n")
+            self._transcript_lines += 1
+            if self._transcript_lines >= 2 * _MAX_HISTORY:
+                self._compact_transcripts(self.data["transcripts"])
+        except Exception:
+            pass
+
+    def _compact_transcripts(self, transcripts):
+        try:
+            _write_atomic(
+                self.transcripts_path,
+                b"".join(_dumps(t) + b"\n" for t in transcripts),
+            )
+            self._transcript_lines = len(transcripts)
+        except Exception:
+            pass
+
     def _save(self):
         try:
-            with open(self.lexicon_path, "w", encoding="utf-8") as f:
-                json.dump(self.data, f, ensure_ascii=False, indent=2)
+            # Transcripts are persisted separately by _append_transcript.
+            data = {k: v for k, v in self.data.items() if k != "transcripts"}
+            _write_atomic(self.lexicon_path, _dumps(data, pretty=_PRETTY))
+            self._dirty = 0
         except Exception:
             pass
 
+    def flush(self):
+        if self._dirty:
+            self._save()
+
     def record_transcript(self, text: str):
         if not text or not text.strip():
             return
 
         timestamp = time.time()
-        self.data["transcripts"].append({"text": text, "timestamp": timestamp})
-
-        max_history = 500
-        if len(self.data["transcripts"]) > max_history:
-            self.data["transcripts"] = self.data["transcripts"][-max_history:]
+        entry = {"text": text, "timestamp": timestamp}
+        self.data["transcripts"].append(entry)
+        self._append_transcript(entry)
 
         self.data["stats"]["total_transcripts"] = (
             self.data["stats"].get("total_transcripts", 0) + 1
         )
 
-        self._extract_hotwords(text)
+        self._extract_hotwords(text, timestamp)
 
         if self._should_update_hotwords():
             self._update_hotword_prompt()
 
-        self._save()
+        self._dirty += 1
+        if self._dirty >= _SAVE_EVERY or timestamp - self._last_save >= _SAVE_INTERVAL:
+            self._last_save = timestamp
+            self._save()
 
-    def _extract_hotwords(self, text: str):
+    def _extract_hotwords(self, text: str, now: Optional[float] = None):
         candidates = self._find_word_candidates(text)
+        if not candidates:
+            return
 
-        for word in candidates:
-            if word in self.data["hotwords"]:
-                self.data["hotwords"][word]["count"] += 1
-                self.data["hotwords"][word]["last_seen"] = time.time()
-            else:
-                self.data["hotwords"][word] = {"count": 1, "last_seen": time.time()}
+        if now is None:
+            now = time.time()
+        self.data["hotwords"].update(candidates)
+        self.data["last_seen"].update(dict.fromkeys(candidates, now))
+
+        if (
+            len(self.data["hotwords"]) > _MAX_HOTWORDS
+            and self._should_update_hotwords()
+        ):
+            self._evict_hotwords()
+
+    def _evict_hotwords(self):
+        counts = self.data["hotwords"]
+        last_seen = self.data["last_seen"]
+        n = len(counts) - (_MAX_HOTWORDS - _EVICT_HOTWORDS)
+        victims = heapq.nsmallest(
+            n, counts, key=lambda w: (counts[w], last_seen.get(w, 0))
+        )
+        for word in victims:
+            del counts[word]
+            last_seen.pop(word, None)
 
     def _find_word_candidates(self, text: str) -> Set[str]:
         candidates = set()
-
-        en_words = re.findall(r"\b[A-Z][A-Za-z0-9_\-]{2,}\b", text)
-        candidates.update(en_words)
-
-        acronyms = re.findall(r"\b[A-Z]{2,}\b", text)
-        candidates.update(acronyms)
-
-        mixed = re.findall(r"[A-Za-z]+[0-9]+|[0-9]+[A-Za-z]+", text)
+        # One scan rules out all four patterns for text without Latin letters
+        # (plain Chinese dictation, the common case).
+        if not _RE_ASCII_LETTER.search(text):
+            return candidates
+
+        # Cheap C-level str scans prune patterns that cannot match: the camel
+        # and acronym patterns need an uppercase letter, the Chinese+English
+        # one needs a non-ASCII character.
+        if not text.islower():
+            en_words = _RE_CAMEL.findall(text)
+            candidates.update(en_words)
+
+            acronyms = _RE_ACRONYM.findall(text)
+            candidates.update(acronyms)
+
+        mixed = _RE_MIXED.findall(text)
         candidates.update(mixed)
 
-        cn_en_phrases = re.findall(r"[\u4e00-\u9fff]{2,}[A-Za-z]{2,}", text)
-        candidates.update(cn_en_phrases)
+        if not text.isascii():
+            cn_en_phrases = _RE_CN_EN.findall(text)
+            candidates.update(cn_en_phrases)
 
         return candidates
 
@@ -111,29 +275,31 @@ class UserLexicon:
                 return
 
             with open(prompt_path, "r", encoding="utf-8") as f:
-                prompt = f.read()
+                prompt = original = f.read()
 
             marker = "\n--- Personal Hotwords (auto-generated) ---\n"
             if marker in prompt:
                 prompt = prompt.split(marker)[0]
 
-            sorted_hotwords = sorted(
-                self.data["hotwords"].items(), key=lambda x: x[1]["count"], reverse=True
-            )
-
-            top_hotwords = [w for w, _ in sorted_hotwords[:20] if len(w) >= 2]
+            # most_common(n) is a heapq.nlargest partial selection, not a
+            # full sort of every word ever seen; ties keep insertion order.
+            top_hotwords = [
+                w for w, _ in self.data["hotwords"].most_common(20) if len(w) >= 2
+            ]
 
             if top_hotwords:
                 hotword_section = marker + ", ".join(top_hotwords) + "\n"
-                prompt = prompt.rstrip() + "\n" + hotword_section
+                new_prompt = prompt.rstrip() + "\n" + hotword_section
 
-                with open(prompt_path, "w", encoding="utf-8") as f:
-                    f.write(prompt)
+                # Top hotwords rarely change between updates; skip the rewrite.
+                if new_prompt != original:
+                    with open(prompt_path, "w", encoding="utf-8") as f:
+                        f.write(new_prompt)
 
+            # Persisted with the transcript that triggered the update.
             self.data["stats"]["last_hotword_update"] = self.data["stats"][
                 "total_transcripts"
             ]
-            self._save()
         except Exception:
             pass
 
@@ -141,10 +307,7 @@ class UserLexicon:
         return text
 
     def get_top_hotwords(self, n: int = 20) -> List[str]:
-        sorted_hotwords = sorted(
-            self.data["hotwords"].items(), key=lambda x: x[1]["count"], reverse=True
-        )
-        return [w for w, _ in sorted_hotwords[:n]]
+        return [w for w, _ in self.data["hotwords"].most_common(n)]
 
     def get_stats(self) -> dict:
         return {
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+
+"""Check when an endpoint reuses the last partial instead of re-transcribing.
+
+Drives Service._stream_push with a stub engine (no model needed) and
+synthetic audio: speech-level noise, then silence, pushed in fixed-size
+chunks like the clients do. Exits non-zero if any case takes the wrong path.
+
+  python3 scripts/check_endpoint_reuse.py
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "Python"))
+
+import jsp_speech_service as svc_mod  # noqa: E402
+
+SR = 16000
+
+
+class StubEngine:
+    def __init__(self, partial_text=None):
+        # Text for every call; None returns the window size so each
+        # transcript says how much audio it saw.
+        self.text = partial_text
+        self.calls = []
+
+    def transcribe(self, audio_f32, sample_rate_hz, language, prompt):
+        self.calls.append(int(audio_f32.size))
+        return self.text if self.text is not None else f"heard {audio_f32.size}"
+
+
+def run(speech_s, push_ms, partial_text=None, **session_kw):
+    # Returns (reused, samples the endpoint transcribe saw or 0 if reused).
+    svc_mod._USER_LEXICON_AVAILABLE = False
+    svc = svc_mod.Service()
+    engine = svc.engine = StubEngine(partial_text)
+    sess = svc_mod.StreamSession(
+        sample_rate_hz=SR, language="zh", prompt=None, **session_kw
+    )
+    svc.sessions["s"] = sess
+    rng = np.random.default_rng(0)
+    audio = np.concatenate(
+        [0.3 * rng.standard_normal(int(speech_s * SR)), np.zeros(SR)]
+    )
+    pcm = (np.clip(audio, -1.0, 1.0) * 32767).astype(np.int16).tobytes()
+    step = int(SR * push_ms / 1000) * 2
+    for i in range(0, len(pcm), step):
+        n_calls = len(engine.calls)
+        utterance = sess.buffer_len + step // 2 - sess.speech_start()
+        r = svc._stream_push("r", "s", pcm[i : i + step])["result"]
+        if r["kind"] == "final":
+            # Partials never run on the endpoint push, so any call here is
+            # the full-utterance transcribe.
+            new = engine.calls[n_calls:]
+            return not new, (new[-1] if new else 0), utterance
+    raise SystemExit("no endpoint detected")
+
+
+def main():
+    failures = 0
+
+    def check(name, got, want):
+        nonlocal failures
+        ok = got == want
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {name}: reused={got} (want {want})")
+
+    # Every client chunk size in the repo: mic/test client 300 ms, Swift host
+    # 500 ms. A 2 s utterance fits the partial window, so the final reuses it.
+    for push_ms in (300, 500):
+        reused, _, _ = run(2.0, push_ms)
+        check(f"{push_ms} ms pushes, 2 s utterance", reused, True)
+
+    # Opt-out: always transcribe the whole utterance.
+    reused, seen, utterance = run(2.0, 300, trust_last_partial_on_endpoint=False)
+    check("trust_last_partial_on_endpoint=false", reused, False)
+    if seen != utterance:
+        failures += 1
+        print(f"FAIL full transcribe saw {seen} samples, utterance is {utterance}")
+
+    # Utterance longer than the partial window: partials only saw its tail,
+    # so the final must transcribe all of it.
+    reused, seen, utterance = run(12.0, 100, max_partial_context_s=5)
+    check("12 s utterance, 5 s partial window", reused, False)
+    if seen != utterance:
+        failures += 1
+        print(f"FAIL full transcribe saw {seen} samples, utterance is {utterance}")
+
+    # Speech arrived after the last partial ran: its text is stale.
+    reused, _, _ = run(2.0, 300, partial_interval_ms=1500)
+    check("speech after the last partial", reused, False)
+
+    # Partials that came back empty leave nothing to reuse.
+    reused, _, _ = run(2.0, 300, partial_text="")
+    check("empty partials", reused, False)
+
+    if failures:
+        raise SystemExit(f"{failures} check(s) failed")
+
+
+if __name__ == "__main__":
+    main()
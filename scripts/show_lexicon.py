@@ -21,7 +21,7 @@ def main():
     if stats["top_hotwords"]:
         print("🔥 Top 10 高频词:")
         for i, word in enumerate(stats["top_hotwords"], 1):
-            count = lexicon.data["hotwords"][word]["count"]
+            count = lexicon.data["hotwords"][word]
             print(f"  {i:2}. {word:20} (出现 {count} 次)")
     else:
         print("还没有学到任何词，多说几句试试！")